@@ -1,18 +1,31 @@
+import hashlib
+import io
+import json
 import os
+import shutil
+import struct
+import tempfile
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, render_template, request, url_for, redirect, send_file, flash
 from werkzeug.utils import secure_filename
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
+from reportlab.platypus import Frame, Paragraph, Spacer
+from xml.sax.saxutils import escape
 from PIL import Image
 
 # --- Configuration ---
 UPLOAD_FOLDER = "uploads"
 OUTPUT_FOLDER = "outputs"
-ALLOWED_IMG = {"png", "jpg", "jpeg", "gif"}
+ALLOWED_IMG = frozenset({"png", "jpg", "jpeg", "gif"})
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -23,32 +36,138 @@ app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["OUTPUT_FOLDER"] = OUTPUT_FOLDER
 app.config["MAX_CONTENT_LENGTH"] = 64 * 1024 * 1024
 
-def allowed_file(filename):
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_IMG
+# Shared pool so /generate can build DOCX and PDF concurrently without
+# paying thread startup cost per request
+executor = ThreadPoolExecutor(max_workers=4)
+
+# In-flight background PDF builds, keyed by output filename so
+# /download/pdf can wait for one that hasn't finished yet
+_pdf_jobs = {}
+
+# The header logo never changes, so decode it once at import time instead of
+# re-reading the PNG on every page of every request
+LOGO_PATH = os.path.join("static", "sec_logo.png")
+try:
+    with open(LOGO_PATH, "rb") as f:
+        _LOGO_BYTES = f.read()
+    _LOGO_READER = ImageReader(LOGO_PATH)
+    _LOGO_W, _LOGO_H = _LOGO_READER.getSize()
+except Exception:
+    _LOGO_BYTES = None
+    _LOGO_READER = None
+
+# Paragraph styles for the PDF report body (matches the old manual
+# Helvetica 10 / Helvetica-Bold 11 look)
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_BODY = _PDF_STYLES["BodyText"]
+_PDF_HEAD = ParagraphStyle("SectionHead", parent=_PDF_BODY,
+                           fontName="Helvetica-Bold", fontSize=11,
+                           leading=14, spaceBefore=8, spaceAfter=4)
 
-def save_file(fileobj):
+def allowed_file(filename):
+    # rpartition does one scan from the right instead of rsplit's list build;
+    # an empty separator means there was no dot at all
+    _, sep, ext = filename.rpartition(".")
+    return bool(sep) and ext.lower() in ALLOWED_IMG
+
+def save_file(fileobj, _dir=UPLOAD_FOLDER):
+    # _dir is bound at def time: photo batches call this in a loop and the
+    # app.config dict lookup per file adds up
     if not fileobj:
         return None
     filename = secure_filename(fileobj.filename)
-    path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    fileobj.save(path)
+    path = os.path.join(_dir, filename)
+    # stream to disk in 1 MiB chunks so a 64 MB upload never has to sit
+    # fully in memory while being written out
+    with open(path, "wb") as dst:
+        shutil.copyfileobj(fileobj.stream, dst, 1024 * 1024)
     return path
 
+# RAM-backed scratch space: doc.save/canvas.save issue many small writes,
+# which are much cheaper against tmpfs than the output filesystem
+_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+def _scratch_file(suffix):
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix, dir=_SCRATCH_DIR)
+    os.close(fd)
+    return tmp_path
+
+def _publish(tmp_path, final_path):
+    # os.replace is atomic but only works within one filesystem; when the
+    # scratch dir is tmpfs, stage a copy next to the target and replace that,
+    # so readers never observe a half-written output file
+    try:
+        os.replace(tmp_path, final_path)
+    except OSError:
+        staged = final_path + ".part"
+        shutil.copyfile(tmp_path, staged)
+        os.replace(staged, final_path)
+        os.unlink(tmp_path)
+
+def prepare_image(path):
+    # Phone-camera uploads can be 10-20 MP; both builders only ever show them
+    # a few inches wide. Downsample once to a sibling JPEG so the DOCX embeds
+    # small bytes and the PDF decodes small images, instead of each builder
+    # paying for the full-resolution original.
+    try:
+        im = Image.open(path)
+        im.thumbnail((1200, 1200), Image.LANCZOS)
+        # keep the original extension in the name so e.g. x.jpg and x.png
+        # don't collide on the same thumbnail path
+        small_path = path + ".small.jpg"
+        im.convert("RGB").save(small_path, "JPEG", quality=82)
+        return small_path
+    except Exception:
+        # fall back to the original upload if PIL can't handle it
+        return path
+
+def report_blocks(data):
+    # Single source of truth for the report body: both builders walk this
+    # (kind, text) list, so section titles, ordering and which optional
+    # sections appear cannot drift between the DOCX and the PDF
+    blocks = [
+        ("H2", "Workshop Overview"),
+        ("P", data.get("overview", "")),
+    ]
+    if data.get("day1"):
+        blocks.append(("H3", "Day 1: Fundamentals and Demonstrations"))
+        blocks.append(("P", data.get("day1", "")))
+    if data.get("day2"):
+        blocks.append(("H3", "Day 2: Advanced Troubleshooting and Maintenance"))
+        blocks.append(("P", data.get("day2", "")))
+    if data.get("learning_outcomes"):
+        blocks.append(("H2", "Learning Outcomes"))
+        blocks.append(("P", data.get("learning_outcomes", "")))
+    blocks.append(("H2", "Conclusion"))
+    blocks.append(("P", data.get("conclusion", "")))
+    return blocks
+
 # ---- Helpers to build docx ----
-def build_docx(path, data, invitation_path, photo_paths):
+def _build_docx_template():
+    # Skeleton with the static header (logo + college name, applies to all
+    # pages) already in place; built once so per-request documents skip the
+    # header assembly and the style resolution behind it
     doc = Document()
-
-    # Setup header with logo and college name (applies to all pages)
     section = doc.sections[0]
     header = section.header
     hdr_p = header.paragraphs[0] if header.paragraphs else header.add_paragraph()
     hdr_p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
     run = hdr_p.add_run()
     try:
-        run.add_picture(os.path.join("static", "sec_logo.png"), width=Inches(1.6))
+        if _LOGO_BYTES:
+            run.add_picture(io.BytesIO(_LOGO_BYTES), width=Inches(1.6))
     except Exception:
         pass
     hdr_p.add_run("\nSURYA ENGINEERING COLLEGE, ERODE").bold = True
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+_DOCX_TEMPLATE_BYTES = _build_docx_template()
+
+def build_docx(path, data, invitation_path, photo_paths):
+    # clone the cached skeleton instead of rebuilding the header per request
+    doc = Document(io.BytesIO(_DOCX_TEMPLATE_BYTES))
 
     # Page 1: Circular (matching uploaded sample layout)
     # Reference and Date row (left blank and right aligned like sample)
@@ -93,22 +212,12 @@ def build_docx(path, data, invitation_path, photo_paths):
 
     # Add structured sections (Overview, Session Highlights, Outcomes, Conclusion)
     doc.add_paragraph("\n")
-    doc.add_paragraph("Workshop Overview", style='Heading 2')
-    doc.add_paragraph(data.get("overview", ""))
-
-    if data.get("day1"):
-        doc.add_paragraph("\nDay 1: Fundamentals and Demonstrations", style='Heading 3')
-        doc.add_paragraph(data.get("day1", ""))
-    if data.get("day2"):
-        doc.add_paragraph("\nDay 2: Advanced Troubleshooting and Maintenance", style='Heading 3')
-        doc.add_paragraph(data.get("day2", ""))
-
-    if data.get("learning_outcomes"):
-        doc.add_paragraph("\nLearning Outcomes", style='Heading 2')
-        doc.add_paragraph(data.get("learning_outcomes"))
-
-    doc.add_paragraph("\nConclusion", style='Heading 2')
-    doc.add_paragraph(data.get("conclusion", ""))
+    heading_styles = {"H2": "Heading 2", "H3": "Heading 3"}
+    for i, (kind, text) in enumerate(report_blocks(data)):
+        if kind == "P":
+            doc.add_paragraph(text)
+        else:
+            doc.add_paragraph(("\n" if i else "") + text, style=heading_styles[kind])
 
     doc.add_paragraph("\n\nFunction was inaugurated by our resource person\n\n")
     # Leave space then signatures as in sample
@@ -122,13 +231,13 @@ def build_docx(path, data, invitation_path, photo_paths):
     # Page 3: Photos layout (grid)
     doc.add_paragraph("Event Photographs", style='Heading 1')
     if photo_paths:
-        # Insert images two per row
+        # One table sized up-front, two photos per row: building a separate
+        # table per pair made python-docx redo XML construction and style
+        # resolution for every two photos
+        grid = doc.add_table(rows=(len(photo_paths) + 1) // 2, cols=2)
         for i, p in enumerate(photo_paths):
             try:
-                # Create a 2-cell row table for each pair
-                if i % 2 == 0:
-                    row_cells = doc.add_table(rows=1, cols=2).rows[0].cells
-                run = row_cells[i % 2].paragraphs[0].add_run()
+                run = grid.rows[i // 2].cells[i % 2].paragraphs[0].add_run()
                 run.add_picture(p, width=Inches(3))
             except Exception:
                 # if image insertion fails, continue
@@ -136,30 +245,129 @@ def build_docx(path, data, invitation_path, photo_paths):
     else:
         doc.add_paragraph("No photos uploaded.")
 
-    doc.save(path)
+    tmp_path = _scratch_file(".docx")
+    try:
+        doc.save(tmp_path)
+        _publish(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
     return path
 
 # ---- Helpers to build PDF ----
+@lru_cache(maxsize=4096)
+def _word_width(word, font, size):
+    return pdfmetrics.stringWidth(word, font, size)
+
+def wrap_to_width(text, font, size, max_w):
+    # Greedy wrap against real font metrics. textwrap.wrap's fixed character
+    # count is off by up to ~30% for proportional fonts, so lines either
+    # overflow the margin or waste vertical space and force extra pages.
+    space_w = _word_width(" ", font, size)
+    lines, line, line_w = [], [], 0
+    for word in text.split():
+        word_w = _word_width(word, font, size)
+        if line and line_w + space_w + word_w > max_w:
+            lines.append(" ".join(line))
+            line, line_w = [word], word_w
+        else:
+            line_w += word_w + (space_w if line else 0)
+            line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+def _img_size(path):
+    # Width/height live in the first bytes of the file for PNG/GIF and in
+    # the SOF marker for JPEG, so read them with struct instead of spinning
+    # up a PIL decoder. Returns (width, height, format) or None when the
+    # header isn't recognised.
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", head[16:24])
+            return width, height, "png"
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            width, height = struct.unpack("<HH", head[6:10])
+            return width, height, "gif"
+        if head[:2] == b"\xff\xd8":
+            # walk the marker segments to the first start-of-frame
+            f.seek(2)
+            while True:
+                seg = f.read(2)
+                if len(seg) < 2 or seg[0] != 0xFF:
+                    return None
+                marker = seg[1]
+                if marker == 0xFF:
+                    f.seek(-1, 1)  # fill byte, resync on the next 0xFF
+                    continue
+                if marker in (0x01,) or 0xD0 <= marker <= 0xD8:
+                    continue  # standalone marker, no length field
+                length_bytes = f.read(2)
+                if len(length_bytes) < 2:
+                    return None
+                (length,) = struct.unpack(">H", length_bytes)
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    body = f.read(5)
+                    if len(body) < 5:
+                        return None
+                    _, height, width = struct.unpack(">BHH", body)
+                    return width, height, "jpeg"
+                f.seek(length - 2, 1)
+    return None
+
+def _fast_dims_and_reader(path):
+    # Hand ReportLab JPEG bytes wherever possible: JPEG sources pass straight
+    # through into the PDF as DCT streams (no decode, no re-encode), and
+    # opaque non-JPEGs are re-encoded once at quality 82, which shrinks the
+    # output several-fold versus the zlib bitmap ReportLab stores for PIL
+    # images. Images with transparency keep the PIL path so alpha survives.
+    probed = _img_size(path)
+    if probed and probed[2] == "jpeg":
+        # common case after prepare_image: dimensions straight from the
+        # header, and PIL is never involved at all
+        return (probed[0], probed[1]), ImageReader(path)
+    im = Image.open(path)
+    if im.format == "JPEG":
+        return im.size, ImageReader(path)
+    if "A" in im.getbands() or "transparency" in im.info:
+        return im.size, ImageReader(im)
+    buf = io.BytesIO()
+    im.convert("RGB").save(buf, "JPEG", quality=82, optimize=True)
+    buf.seek(0)
+    return im.size, ImageReader(buf)
+
 def build_pdf(path, data, invitation_path, photo_paths):
-    # Create PDF with header on each page
-    c = canvas.Canvas(path, pagesize=A4)
+    # Create PDF with header on each page, writing to scratch space and
+    # publishing atomically once complete. pageCompression deflates the
+    # content streams; invariant drops the timestamp/ID entropy so identical
+    # input produces byte-identical (and therefore cacheable) output.
+    tmp_path = _scratch_file(".pdf")
+    c = canvas.Canvas(tmp_path, pagesize=A4, pageCompression=1, invariant=1)
     w, h = A4
-    logo_path = os.path.join("static", "sec_logo.png")
 
     def draw_header():
-        # draw logo centered
+        # draw logo centered, reusing the cached reader so the PNG is decoded once
         try:
-            im = Image.open(logo_path)
-            iw, ih = im.size
-            target_w = 120  # px approximate
-            ratio = target_w / iw
-            target_h = ih * ratio
-            c.drawInlineImage(logo_path, (w/2 - target_w/2), h - 80, width=target_w, height=target_h)
+            if _LOGO_READER is not None:
+                target_w = 120  # px approximate
+                ratio = target_w / _LOGO_W
+                target_h = _LOGO_H * ratio
+                c.drawImage(_LOGO_READER, (w/2 - target_w/2), h - 80, width=target_w, height=target_h, mask='auto')
         except Exception:
             pass
         c.setFont("Helvetica-Bold", 12)
         c.drawCentredString(w/2, h-95, "SURYA ENGINEERING COLLEGE, ERODE")
 
+    def draw_text_block(text, x, y, size=10):
+        # emit the whole block as one BT/ET text object with T* line
+        # advances instead of a drawString (and a Tj operator) per line
+        t = c.beginText(x, y)
+        t.setFont("Helvetica", size)
+        t.textLines(wrap_to_width(text, "Helvetica", size, w - x - 50))
+        c.drawText(t)
+        return t.getY()
+
     # Page 1 - Circular
     draw_header()
     c.setFont("Helvetica-Bold", 11)
@@ -172,22 +380,17 @@ def build_pdf(path, data, invitation_path, photo_paths):
     y = h-180
     if invitation_path:
         try:
-            im = Image.open(invitation_path)
-            iw, ih = im.size
+            (iw, ih), reader = _fast_dims_and_reader(invitation_path)
             max_w = w - 100
             ratio = max_w / iw
             draw_w = max_w
             draw_h = ih * ratio
-            c.drawInlineImage(invitation_path, 50, y-draw_h-10, width=draw_w, height=draw_h)
+            c.drawImage(reader, 50, y-draw_h-10, width=draw_w, height=draw_h)
             y = y - draw_h - 40
         except Exception:
-            c.setFont("Helvetica", 10)
-            c.drawString(50, y, data.get("circular_text",""))
-            y -= 20
+            y = draw_text_block(data.get("circular_text",""), 50, y) - 20
     else:
-        c.setFont("Helvetica", 10)
-        c.drawString(50, y, data.get("circular_text",""))
-        y -= 20
+        y = draw_text_block(data.get("circular_text",""), 50, y) - 20
 
     c.drawString(50, 120, "HoD\t\t\t\tPRINCIPAL")
     c.showPage()
@@ -198,90 +401,46 @@ def build_pdf(path, data, invitation_path, photo_paths):
     c.drawCentredString(w/2, h-120, f"DEPARTMENT OF {data.get('department','')}")
     c.setFont("Helvetica-Bold", 12)
     c.drawCentredString(w/2, h-140, "REPORT OF THE EVENT")
-    y = h-170
-    c.setFont("Helvetica", 10)
-    lines = [
-        f"Name of the activity: {data.get('title','')}",
-        f"Department: {data.get('department','')}",
-        f"Academic year: {data.get('academic_year','')}",
-        f"Date of activity conducted: {data.get('date_activity','')}",
-        f"Organized by: {data.get('organized_by','')}"
+    # Report body as Platypus flowables: Paragraph wraps by real font metrics
+    # and the Frame loop below paginates, replacing four hand-rolled
+    # wrap-and-paginate loops (user text is escaped; Paragraph parses markup)
+    story = [
+        Paragraph(escape(f"Name of the activity: {data.get('title','')}"), _PDF_BODY),
+        Paragraph(escape(f"Department: {data.get('department','')}"), _PDF_BODY),
+        Paragraph(escape(f"Academic year: {data.get('academic_year','')}"), _PDF_BODY),
+        Paragraph(escape(f"Date of activity conducted: {data.get('date_activity','')}"), _PDF_BODY),
+        Paragraph(escape(f"Organized by: {data.get('organized_by','')}"), _PDF_BODY),
+        Spacer(1, 8),
     ]
-    for L in lines:
-        c.drawString(50, y, L)
-        y -= 16
-
-    y -= 8
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(50, y, "Workshop Overview:")
-    y -= 16
-    c.setFont("Helvetica", 10)
-    from textwrap import wrap
-    for ln in wrap(data.get("overview",""), 100):
-        c.drawString(50, y, ln)
-        y -= 14
-        if y < 120:
+    for kind, text in report_blocks(data):
+        if kind == "P":
+            story.append(Paragraph(escape(text), _PDF_BODY))
+        else:
+            # H2 section titles carry a colon in the PDF layout; the day
+            # headings (H3) already contain one
+            story.append(Paragraph(escape(text + (":" if kind == "H2" else "")), _PDF_HEAD))
+
+    # Flow the story into page-sized frames; first frame starts below the
+    # report title, continuation pages only leave room for the header
+    frame = Frame(50, 110, w - 100, (h - 160) - 110)
+    while story:
+        n_before = len(story)
+        frame.addFromList(story, c)
+        if not story:
+            break
+        # first remaining flowable straddles the page: split it so the
+        # top part fills the rest of this frame
+        parts = frame.split(story[0], c)
+        if parts:
+            story[0:1] = parts
+            frame.addFromList(story, c)
+        if story:
+            if len(story) == n_before and not parts:
+                # cannot fit or split even on a fresh page; drop it
+                del story[0]
             c.showPage()
             draw_header()
-            y = h-120
-
-    # Day1, Day2
-    if data.get("day1"):
-        y -= 8
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(50, y, "Day 1: Fundamentals and Demonstrations")
-        y -= 16
-        c.setFont("Helvetica", 10)
-        for ln in wrap(data.get("day1",""), 100):
-            c.drawString(50, y, ln)
-            y -= 14
-            if y < 120:
-                c.showPage()
-                draw_header()
-                y = h-120
-
-    if data.get("day2"):
-        y -= 8
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(50, y, "Day 2: Advanced Troubleshooting and Maintenance")
-        y -= 16
-        c.setFont("Helvetica", 10)
-        for ln in wrap(data.get("day2",""), 100):
-            c.drawString(50, y, ln)
-            y -= 14
-            if y < 120:
-                c.showPage()
-                draw_header()
-                y = h-120
-
-    # Learning Outcomes & Conclusion
-    if data.get("learning_outcomes"):
-        y -= 8
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(50, y, "Learning Outcomes:")
-        y -= 16
-        c.setFont("Helvetica", 10)
-        for ln in wrap(data.get("learning_outcomes",""), 100):
-            c.drawString(50, y, ln)
-            y -= 14
-            if y < 120:
-                c.showPage()
-                draw_header()
-                y = h-120
-
-    if data.get("conclusion"):
-        y -= 8
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(50, y, "Conclusion:")
-        y -= 16
-        c.setFont("Helvetica", 10)
-        for ln in wrap(data.get("conclusion",""), 100):
-            c.drawString(50, y, ln)
-            y -= 14
-            if y < 120:
-                c.showPage()
-                draw_header()
-                y = h-120
+            frame = Frame(50, 110, w - 100, (h - 110) - 110)
 
     # Signatures area
     c.setFont("Helvetica", 10)
@@ -290,6 +449,14 @@ def build_pdf(path, data, invitation_path, photo_paths):
     c.showPage()
 
     # Page 3 - Photos grid
+    # One (dimensions, reader) pair per photo: a single subsampled decode
+    # serves both the ratio maths and the drawImage embed
+    readers = []
+    for p in photo_paths:
+        try:
+            readers.append(_fast_dims_and_reader(p))
+        except Exception:
+            pass
     draw_header()
     c.setFont("Helvetica-Bold", 13)
     c.drawCentredString(w/2, h-120, "Event Photographs")
@@ -300,16 +467,14 @@ def build_pdf(path, data, invitation_path, photo_paths):
     x_positions = [x_margin, x_margin + col_w + 20]
     col = 0
     row = 0
-    for idx, p in enumerate(photo_paths):
+    for idx, ((iw, ih), reader) in enumerate(readers):
         try:
-            im = Image.open(p)
-            iw, ih = im.size
             ratio = min(col_w / iw, row_h / ih)
             draw_w = iw * ratio
             draw_h = ih * ratio
             x = x_positions[col] + (col_w - draw_w)/2
             y = y_start - row*(row_h + 20) - draw_h
-            c.drawInlineImage(p, x, y, width=draw_w, height=draw_h)
+            c.drawImage(reader, x, y, width=draw_w, height=draw_h)
         except Exception:
             pass
         col += 1
@@ -322,9 +487,42 @@ def build_pdf(path, data, invitation_path, photo_paths):
                 y_start = h-160
                 row = 0
 
-    c.save()
+    try:
+        c.save()
+        _publish(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
     return path
 
+def _pdf_is_current(pdf_path, meta_bytes):
+    # current means: the PDF exists and its token records the hash of the
+    # sidecar it was built from
+    if not os.path.exists(pdf_path):
+        return False
+    try:
+        with open(pdf_path + ".token") as f:
+            return f.read().strip() == hashlib.sha1(meta_bytes).hexdigest()
+    except OSError:
+        return False
+
+def _build_pdf_from_meta(pdf_path, meta_bytes):
+    # Build from a snapshot of the sidecar and stamp the result with the
+    # snapshot's hash (published after the PDF itself), so /download/pdf can
+    # tell which sidecar generation an on-disk PDF was built from even when
+    # a build from an older generation finishes late or another worker
+    # process built it.
+    meta = json.loads(meta_bytes)
+    build_pdf(pdf_path, meta["data"], meta["invitation_path"], meta["photo_paths"])
+    tmp_path = _scratch_file(".token")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(hashlib.sha1(meta_bytes).hexdigest())
+        _publish(tmp_path, pdf_path + ".token")
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
 # ---- Routes ----
 @app.route("/")
 def index():
@@ -354,33 +552,46 @@ def generate():
     invitation_file = request.files.get("invitation")
     invitation_path = None
     if invitation_file and allowed_file(invitation_file.filename):
-        invitation_path = save_file(invitation_file)
+        invitation_path = prepare_image(save_file(invitation_file))
 
     photos = request.files.getlist("photos")
-    photo_paths = []
-    for p in photos:
-        if p and allowed_file(p.filename):
-            photo_paths.append(save_file(p))
+    raw_paths = [save_file(p) for p in photos if p and allowed_file(p.filename)]
+    # Fan the per-photo resize + JPEG encode out on the shared pool: PIL's
+    # resize and encode run in native code that releases the GIL, so threads
+    # scale here without forking a process pool under live threads (which
+    # can deadlock the child on locks held at fork time).
+    photo_paths = list(executor.map(prepare_image, raw_paths))
 
     # Create DOCX preview file in outputs
     base_name = secure_filename((data.get("title") or "event").replace(" ", "_"))
     docx_path = os.path.join(app.config["OUTPUT_FOLDER"], f"{base_name}.docx")
     pdf_path = os.path.join(app.config["OUTPUT_FOLDER"], f"{base_name}.pdf")
 
-    # Build DOCX (used as canonical source)
+    docx_future = executor.submit(build_docx, docx_path, data, invitation_path, photo_paths)
+
+    # Don't build the PDF at all yet: many users only ever take the DOCX.
+    # Persist the build inputs next to the outputs so /download/pdf can
+    # build (and memoize) the PDF on first request. Clean up the previous
+    # generation's PDF eagerly; correctness doesn't depend on it, since
+    # /download/pdf checks the PDF's token against the current sidecar.
+    _pdf_jobs.pop(os.path.basename(pdf_path), None)
+    for stale in (pdf_path, pdf_path + ".token"):
+        try:
+            os.unlink(stale)
+        except FileNotFoundError:
+            pass
+    meta_path = os.path.splitext(pdf_path)[0] + ".meta.json"
+    with open(meta_path, "w") as f:
+        json.dump({"data": data, "invitation_path": invitation_path,
+                   "photo_paths": photo_paths}, f)
+
+    # DOCX is the canonical source; its failure aborts the request
     try:
-        build_docx(docx_path, data, invitation_path, photo_paths)
+        docx_future.result()
     except Exception as e:
         flash(f"Error creating DOCX: {e}", "danger")
         return redirect(url_for("index"))
 
-    # Build PDF for download option (but we won't force convert unless user chooses)
-    try:
-        build_pdf(pdf_path, data, invitation_path, photo_paths)
-    except Exception:
-        # ignore PDF build errors; we can attempt to build on-demand later
-        pass
-
     # Render a fairly exact preview (type A) using the same data and saved images
     # preview.html will show layout similar to doc format
     return render_template("preview.html",
@@ -395,14 +606,52 @@ def download(fmt, filename):
     # fmt either 'docx' or 'pdf'
     fpath = os.path.join(app.config["OUTPUT_FOLDER"], filename)
     if fmt == "pdf":
-        # if PDF not exist, try to build from docx data? We'll just return if present.
+        # PDFs are built lazily, and an on-disk PDF only counts if its token
+        # matches the current sidecar: a build started before the report was
+        # regenerated (or finished by another worker process) carries the old
+        # generation's hash, so bare existence can't be trusted.
+        meta_bytes = None
+        meta_path = os.path.splitext(fpath)[0] + ".meta.json"
+        try:
+            with open(meta_path, "rb") as f:
+                meta_bytes = f.read()
+        except OSError:
+            pass
+        if meta_bytes is not None and not _pdf_is_current(fpath, meta_bytes):
+            # Join an in-flight build; if it was for an older sidecar its
+            # token still won't match, so rebuild once from the current one.
+            # Build errors fall through to the existence check below.
+            for _ in range(2):
+                job = _pdf_jobs.get(filename)
+                if job is None:
+                    job = _pdf_jobs.setdefault(filename, executor.submit(
+                        _build_pdf_from_meta, fpath, meta_bytes))
+                try:
+                    job.result(timeout=30)
+                except Exception:
+                    pass
+                _pdf_jobs.pop(filename, None)
+                if _pdf_is_current(fpath, meta_bytes):
+                    break
         if not os.path.exists(fpath):
             return "PDF not available", 404
     if not os.path.exists(fpath):
         return "File not found", 404
-    return send_file(fpath, as_attachment=True)
+    # conditional=True gets us ETag/304 and Range handling from Werkzeug, so
+    # repeat downloads of the same report cost a header exchange, not the file
+    resp = send_file(fpath, as_attachment=True, conditional=True,
+                     last_modified=os.path.getmtime(fpath))
+    # no-cache (not no-store) forces revalidation, so clients still get the
+    # 304 path but never serve stale bytes after a report is regenerated
+    # under the same title
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
 if __name__ == "__main__":
+    # Dev convenience only: the Werkzeug server handles one request at a
+    # time and the debugger/reloader add per-request overhead. Deploy behind
+    # a real WSGI server so PDF builds run in parallel across cores:
+    #   gunicorn -w $(nproc) -k gthread --threads 4 --timeout 120 app:app
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port)
 